@@ -1,8 +1,78 @@
 import re
-import json
-from bs4 import BeautifulSoup
-from collections import defaultdict
-import math
+import string
+import multiprocessing
+import os
+import sys
+import ahocorasick
+import numpy as np
+import orjson
+from selectolax.lexbor import LexborHTMLParser
+from numba import njit
+
+
+# Short literal markers -- C-level substring search beats a regex alternation
+# for these.
+_CURRENCY_TOKENS = ('€', '$', '£', 'usd', 'eur', 'gbp', 'myr')
+_CTA_TOKENS = ('add to bag', 'add to cart', 'buy now', 'add to wishlist')
+
+# Precompiled patterns -- avoids the re-cache lookup on every
+# _get_stable_selector call. Bound fullmatch skips the anchor handling of
+# ^...$ via match on short identifier strings.
+_ID_FULLMATCH = re.compile(r'[a-zA-Z][a-zA-Z0-9\-_.]*').fullmatch
+_NONALPHA_RE = re.compile(r'[^a-z]')
+# One table lowercases and splits dash/underscore compounds in a single
+# .translate() pass; keywords are all ASCII so the ASCII-only case fold is
+# enough.
+_NORM_TBL = str.maketrans(
+    string.ascii_uppercase + '-_',
+    string.ascii_lowercase + '  '
+)
+
+# Tags that can never clear the confidence threshold, and inline tags that
+# only matter when they carry an identifying attribute.
+_SKIP_TAGS = frozenset({'br', 'hr', 'meta', 'link', 'style', 'noscript', 'svg', 'path', 'head', 'title'})
+_LIGHT_TAGS = frozenset({'span', 'i', 'b', 'em', 'strong'})
+
+# Below this element count the fork/pickle overhead of a process pool costs
+# more than it saves.
+_PARALLEL_MIN_ELEMENTS = 5000
+
+# Confidence threshold an element must clear to contribute its selector
+_SCORE_THRESHOLD = 15
+
+
+def _is_word_boundary(text, start, end):
+    """Checks that text[start:end] is not flanked by word characters (\\b semantics)."""
+    if start > 0 and (text[start - 1].isalnum() or text[start - 1] == '_'):
+        return False
+    if end < len(text) and (text[end].isalnum() or text[end] == '_'):
+        return False
+    return True
+
+
+@njit(cache=True)
+def _accumulate(match_weights, factor):
+    """Sums matched keyword weights scaled by a signal factor (compiled)."""
+    total = 0.0
+    for i in range(match_weights.shape[0]):
+        total += match_weights[i] * factor
+    return total
+
+
+# Per-process scorer for the multiprocessing path; set once by the pool
+# initializer so each task ships only its record shard.
+_WORKER_RANKER = None
+
+
+def _init_score_worker(ranker):
+    global _WORKER_RANKER
+    _WORKER_RANKER = ranker
+
+
+def _score_chunk(records):
+    """Scores one shard of element records in a worker process."""
+    return _WORKER_RANKER._rank_records(records)
+
 
 class AssetSelectorRanker:
     """
@@ -22,8 +92,8 @@ class AssetSelectorRanker:
             raise TypeError("html_content must be a string.")
             
         self.html = html_content
-        self.soup = BeautifulSoup(self.html, 'lxml')
-        
+
+
         # --- Configuration ---
         # Keywords with associated weights, tailored for e-commerce
         self.keywords = {
@@ -40,106 +110,191 @@ class AssetSelectorRanker:
         self.STABLE_ATTRIBUTES = [
             'id', 'data-testid', 'data-product-id', 'data-sku', 'data-cy', 'data-test', 'name'
         ]
-        
+        # Frozenset mirror for O(1) membership tests in the hot path; the
+        # list above keeps the priority order for selector generation
+        self._STABLE_SET = frozenset(self.STABLE_ATTRIBUTES)
+
+
         # A blocklist of common, unhelpful CSS class prefixes or names
         self.CLASS_BLOCKLIST = ['ltr-', 's-']
-        
+        # re compiles the prefix alternation down to a trie-style match in C,
+        # so this stays cheap however far users extend the blocklist
+        self._block_trie = re.compile(
+            r'^(?:' + '|'.join(re.escape(p) for p in self.CLASS_BLOCKLIST) + r')'
+        )
+
+
         self.ranked_selectors = []
+        # Listing pages repeat structurally identical cards; memoize per
+        # element fingerprint so duplicates are scored once.
+        self._score_cache = {}
+        self._selector_cache = {}
+        self._build_keyword_automaton()
 
-    def _get_stable_selector(self, element):
+        # lexbor parses and walks the document at C speed; flatten straight
+        # to scoring records since nothing here mutates the tree.
+        tree = LexborHTMLParser(self.html)
+        self._records = self._collect_records(tree)
+        self._json_ld_payloads = [
+            node.text(deep=True) for node in tree.css('script[type="application/ld+json"]')
+        ]
+
+    def _collect_records(self, tree):
+        """Flattens the parsed document into (tag, attrib, text) records."""
+        records = []
+        stable_set = self._STABLE_SET
+        for node in tree.root.traverse(include_text=False):
+            tag = node.tag
+            # lexbor reports comments/doctype as '-comment', '-undef', ...
+            if tag in _SKIP_TAGS or tag[0] == '-':
+                continue
+            # Valueless attributes come back as None
+            attrib = {k: v if v is not None else '' for k, v in node.attributes.items()}
+            if tag in _LIGHT_TAGS and 'class' not in attrib and stable_set.isdisjoint(attrib):
+                # Bare inline tags almost never break the threshold on their own
+                continue
+            text = node.text(deep=True, separator=' ', strip=True).lower()
+            records.append((tag, attrib, text))
+        return records
+
+    def __getstate__(self):
+        # Worker processes only need the scoring configuration: the parsed
+        # tree is not picklable and the caches are rebuilt per process.
+        state = self.__dict__.copy()
+        for key in ('html', '_records', '_json_ld_payloads', '_ac', '_kw_weights',
+                    '_score_cache', '_selector_cache', 'ranked_selectors'):
+            state.pop(key, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.ranked_selectors = []
+        self._score_cache = {}
+        self._selector_cache = {}
+        self._build_keyword_automaton()
+
+    def _build_keyword_automaton(self):
         """
-        Generates a stable, readable CSS selector for a given element.
-        Prioritizes attributes from self.STABLE_ATTRIBUTES, then classes.
+        (Re)builds the Aho-Corasick automaton over self.keywords.
+        One automaton pass yields every keyword hit in a string, replacing a
+        re.search call per keyword per element.
         """
-        if not hasattr(element, 'name') or not element.name:
-            return None
+        self._ac = ahocorasick.Automaton()
+        # Payloads carry (index, length) into a flat weights vector rather
+        # than the weight itself, so scoring does one vectorized lookup per
+        # string instead of a dict hash per match
+        self._kw_weights = np.fromiter(self.keywords.values(), dtype=np.float64,
+                                       count=len(self.keywords))
+        for index, keyword in enumerate(self.keywords):
+            self._ac.add_word(keyword, (index, len(keyword)))
+        self._ac.make_automaton()
 
+    def _get_stable_selector(self, tag, attrib):
+        """
+        Generates a stable, readable CSS selector for a given element record.
+        Prioritizes attributes from self.STABLE_ATTRIBUTES, then classes.
+        """
         # Priority 1: A stable, unique identifier attribute
         for attr in self.STABLE_ATTRIBUTES:
-            if element.has_attr(attr):
-                val = element[attr]
-                # Regex to check for stable, string-based identifiers
-                if isinstance(val, str) and re.match(r'^[a-zA-Z][a-zA-Z0-9\-_.]*$', val):
-                    return f"{element.name}[{attr}='{val}']"
+            val = attrib.get(attr)
+            # Stable, string-based identifiers only; the first-char test
+            # rejects UUID/digit-prefixed ids without invoking the regex
+            if val and val[0].isalpha() and _ID_FULLMATCH(val):
+                return f"{tag}[{attr}='{val}']"
 
         # Priority 2: A meaningful combination of classes, avoiding blocked ones
-        if element.has_attr('class'):
+        class_attr = attrib.get('class')
+        if class_attr:
             classes = sorted([
-                c for c in element['class'] 
-                if not any(c.startswith(prefix) for prefix in self.CLASS_BLOCKLIST)
+                c for c in class_attr.split()
+                if self._block_trie.match(c) is None
             ])
             if classes:
-                return f"{element.name}.{'.'.join(classes)}"
-        
+                return f"{tag}.{'.'.join(classes)}"
+
         return None
 
-    def _score_element(self, element):
-        """Calculates the asset value score for a single HTML element."""
+    def _score_element(self, tag, attrib, text_content, threshold=_SCORE_THRESHOLD):
+        """
+        Calculates the asset value score for a single element record.
+        Elements that already clear the threshold after the cheap attribute
+        and structural phases skip the text scan (the weaker signal), trading
+        exact magnitudes on confirmed hits for less work per element.
+        """
+        # Bare leaves carry no signal at all
+        if not attrib and not text_content:
+            return 0
+
         score = 0
 
         # 1. Score based on attributes (id, class, data-*)
-        attrs_text = ''
-        for attr, value in element.attrs.items():
-            # Join list values (like class) into a single string
-            attr_val_str = ' '.join(value) if isinstance(value, list) else str(value)
-            attr_text = attr_val_str.replace('-', ' ').replace('_', ' ')
-            
-            # Give higher weight to stable attributes
-            weight = 2.5 if attr in self.STABLE_ATTRIBUTES else 1.0
-            attrs_text += f' {attr.replace("-", " ")} {attr_text}' * int(weight)
-
-        attrs_text = attrs_text.lower()
-        for keyword, weight in self.keywords.items():
-            if re.search(r'\b' + re.escape(keyword) + r'\b', attrs_text):
-                score += weight
-
-        # 2. Score based on text content
-        text_content = element.get_text(strip=True, separator=' ').lower()
-        if text_content:
-            if re.search(r'€|\$|£|usd|eur|gbp|myr', text_content):
+        # Scan each attribute once and scale the hits, rather than repeating
+        # stable-attribute text inside one concatenated string
+        for attr, value in attrib.items():
+            attr_weight = 2.5 if attr in self._STABLE_SET else 1.0
+            attr_text = f'{attr} {value}'.translate(_NORM_TBL)
+            hits = [index for end, (index, length) in self._ac.iter(attr_text)
+                    if _is_word_boundary(attr_text, end - length + 1, end + 1)]
+            if hits:
+                weights = self._kw_weights[np.fromiter(hits, dtype=np.intp, count=len(hits))]
+                score += _accumulate(weights, attr_weight)
+
+        # 2. Structural & Microdata Scoring
+        prop_value = attrib.get('itemprop')
+        if prop_value is not None:
+            score += 20
+            prop_value = prop_value.lower()
+            # Plain substring semantics here, so no boundary check needed
+            hits = [index for _end, (index, _length) in self._ac.iter(prop_value)]
+            if hits:
+                weights = self._kw_weights[np.fromiter(hits, dtype=np.intp, count=len(hits))]
+                score += _accumulate(weights, 1.5)
+
+        if tag == 'script' and attrib.get('type') == 'application/ld+json':
+            score += 150 # Extremely high value
+
+        # 3. Score based on text content -- the expensive phase; skip it once
+        # the element has already cleared the threshold (text only adds)
+        if text_content and score <= threshold:
+            if any(token in text_content for token in _CURRENCY_TOKENS):
                 score += 25
-            if re.search(r'add to bag|add to cart|buy now|add to wishlist', text_content):
+            if any(token in text_content for token in _CTA_TOKENS):
                 score += 30
-            for keyword, weight in self.keywords.items():
-                 if re.search(r'\b' + re.escape(keyword) + r'\b', text_content):
-                    score += weight * 0.5  # Text is a weaker signal
-
-        # 3. Structural & Microdata Scoring
-        if element.has_attr('itemprop'):
-             score += 20
-             prop_value = element['itemprop'].lower()
-             for keyword, weight in self.keywords.items():
-                 if keyword in prop_value:
-                     score += weight * 1.5
-
-        if element.name == 'script' and element.attrs.get('type') == 'application/ld+json':
-            score += 150 # Extremely high value
-            
+            hits = [index for end, (index, length) in self._ac.iter(text_content)
+                    if _is_word_boundary(text_content, end - length + 1, end + 1)]
+            if hits:
+                weights = self._kw_weights[np.fromiter(hits, dtype=np.intp, count=len(hits))]
+                # Text is a weaker signal
+                score += _accumulate(weights, 0.5)
+
         return score
     
     def _learn_from_json_ld(self):
         """Parses JSON-LD scripts to dynamically add relevant keywords."""
-        json_ld_scripts = self.soup.find_all('script', type='application/ld+json')
-        
+        json_ld_payloads = self._json_ld_payloads
+
         def get_all_keys(d, keys_set):
-            if isinstance(d, dict):
-                for k, v in d.items():
-                    sanitized_key = re.sub(r'[^a-z]', '', k.lower())
-                    if sanitized_key:
-                        keys_set.add(sanitized_key)
-                    get_all_keys(v, keys_set)
-            elif isinstance(d, list):
-                for item in d:
-                    get_all_keys(item, keys_set)
+            # Iterative walk: deep schema.org documents would otherwise pay a
+            # Python frame per nesting level
+            stack = [d]
+            while stack:
+                node = stack.pop()
+                if isinstance(node, dict):
+                    for k, v in node.items():
+                        sanitized_key = _NONALPHA_RE.sub('', k.lower())
+                        if sanitized_key:
+                            keys_set.add(sanitized_key)
+                        stack.append(v)
+                elif isinstance(node, list):
+                    stack.extend(node)
 
         all_schema_keys = set()
-        for script in json_ld_scripts:
-            if script.string:
-                try:
-                    data = json.loads(script.string)
-                    get_all_keys(data, all_schema_keys)
-                except (json.JSONDecodeError, AttributeError):
-                    continue
+        for payload in json_ld_payloads:
+            try:
+                data = orjson.loads(payload)
+                get_all_keys(data, all_schema_keys)
+            except orjson.JSONDecodeError:
+                continue
         
         print(f"Discovered {len(all_schema_keys)} potential keywords from JSON-LD schemas.")
         for key in all_schema_keys:
@@ -147,36 +302,95 @@ class AssetSelectorRanker:
                 self.keywords[key] = 10
 
 
+    def _rank_records(self, records):
+        """Scores records and aggregates per-selector totals sequentially."""
+        selector_scores = {}
+        for tag, attrib, text_content in records:
+            attrs_key = tuple(sorted(attrib.items()))
+            fingerprint = (tag, attrs_key, hash(text_content[:128]))
+            score = self._score_cache.get(fingerprint)
+            if score is None:
+                score = self._score_element(tag, attrib, text_content)
+                self._score_cache[fingerprint] = score
+            if score > _SCORE_THRESHOLD:
+                selector_key = (tag, attrs_key)
+                if selector_key in self._selector_cache:
+                    selector = self._selector_cache[selector_key]
+                else:
+                    selector = self._get_stable_selector(tag, attrib)
+                    self._selector_cache[selector_key] = selector
+                if selector:
+                    # Interned keys hash by pointer identity on repeat hits;
+                    # [score, count] lists are far smaller than per-selector dicts
+                    selector = sys.intern(selector)
+                    entry = selector_scores.get(selector)
+                    if entry is None:
+                        selector_scores[selector] = [score, 1]
+                    else:
+                        entry[0] += score
+                        entry[1] += 1
+        return selector_scores
+
+    def _rank_records_parallel(self, records):
+        """
+        Shards records across a process pool and merges the per-worker
+        selector totals. The ranker itself is pickled once per worker (the
+        pool initializer) rather than once per task; the parsed tree and
+        caches are excluded by __getstate__.
+        """
+        ncpus = os.cpu_count() or 1
+        chunk_size = -(-len(records) // ncpus)  # ceil division
+        chunks = [records[i:i + chunk_size] for i in range(0, len(records), chunk_size)]
+
+        selector_scores = {}
+        with multiprocessing.Pool(len(chunks), initializer=_init_score_worker,
+                                  initargs=(self,)) as pool:
+            for local_scores in pool.imap_unordered(_score_chunk, chunks):
+                for selector, (local_score, local_count) in local_scores.items():
+                    selector = sys.intern(selector)
+                    entry = selector_scores.get(selector)
+                    if entry is None:
+                        selector_scores[selector] = [local_score, local_count]
+                    else:
+                        entry[0] += local_score
+                        entry[1] += local_count
+        return selector_scores
+
     def rank_selectors(self):
         """
         Main method to perform the extraction and ranking process.
-        
+
         Returns:
             list: A sorted list of dictionaries, each containing a selector and its score.
         """
         self._learn_from_json_ld()
-        
-        selector_scores = defaultdict(lambda: {'score': 0, 'count': 0})
-        for element in self.soup.find_all(True):
-            score = self._score_element(element)
-            if score > 15: # Confidence threshold
-                selector = self._get_stable_selector(element)
-                if selector:
-                    selector_scores[selector]['score'] += score
-                    selector_scores[selector]['count'] += 1
-        
-        final_ranks = []
-        for selector, data in selector_scores.items():
-            # Boost score based on repetition count (logarithmic boost)
-            final_score = data['score'] * (1 + math.log10(data['count'])) if data['count'] > 0 else data['score']
-            final_ranks.append({
-                'selector': selector,
-                'final_score': round(final_score, 2),
-                'total_base_score': round(data['score'], 2),
-                'count': data['count']
-            })
-            
-        self.ranked_selectors = sorted(final_ranks, key=lambda x: x['final_score'], reverse=True)
+        self._build_keyword_automaton()  # pick up keywords learned from JSON-LD
+
+        records = self._records
+        if len(records) >= _PARALLEL_MIN_ELEMENTS:
+            selector_scores = self._rank_records_parallel(records)
+        else:
+            selector_scores = self._rank_records(records)
+
+        # Boost score based on repetition count (logarithmic boost), done as
+        # one vectorized pass instead of per-selector Python arithmetic
+        selectors = list(selector_scores.keys())
+        n = len(selectors)
+        scores = np.fromiter((entry[0] for entry in selector_scores.values()), dtype=np.float64, count=n)
+        counts = np.fromiter((entry[1] for entry in selector_scores.values()), dtype=np.int64, count=n)
+        final = np.round(scores * (1.0 + np.log10(np.maximum(counts, 1))), 2)
+        base = np.round(scores, 2)
+
+        order = np.argsort(-final, kind='stable')
+        self.ranked_selectors = [
+            {
+                'selector': selectors[i],
+                'final_score': float(final[i]),
+                'total_base_score': float(base[i]),
+                'count': int(counts[i])
+            }
+            for i in order
+        ]
         return self.ranked_selectors
 
     def print_top_n(self, n=25):